@@ -3,28 +3,93 @@ Brisbane Property Intelligence API
 Professional Flask application with clean architecture
 """
 
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from flask import Flask, Response, request, jsonify, stream_with_context
 import os
 import sys
+import gzip
 import logging
 import time
-from datetime import datetime
+from datetime import datetime, timezone
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Import professional services
 from config import Config
 from services import LLMService, PropertyAnalysisService
 from database import PropertyDatabase
-from utils import HealthChecker
+from utils import HealthChecker, ORJSONProvider, now_iso
 
 # Set up logging
-logging.basicConfig(level=logging.INFO)
+logging.basicConfig(level=Config.LOG_LEVEL)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+# Oversized bodies are rejected before they are read or parsed
+app.config['MAX_CONTENT_LENGTH'] = Config.MAX_CONTENT_LENGTH
+
+@app.after_request
+def apply_cors(response):
+    """Echo the Origin header back only for known origins (set lookup, no pattern matching)"""
+    origin = request.headers.get('Origin')
+    if origin in Config.CORS_ORIGINS:
+        response.headers['Access-Control-Allow-Origin'] = origin
+        if request.method == 'OPTIONS':
+            response.headers['Access-Control-Allow-Methods'] = Config.CORS_ALLOW_METHODS
+            response.headers['Access-Control-Max-Age'] = str(Config.CORS_MAX_AGE)
+            requested_headers = request.headers.get('Access-Control-Request-Headers')
+            if requested_headers:
+                response.headers['Access-Control-Allow-Headers'] = requested_headers
+    response.vary.add('Origin')
+    return response
+
+@app.after_request
+def compress_response(response):
+    """Brotli- or gzip-compress larger JSON payloads (history, analysis answers) when the client accepts it"""
+    if (response.direct_passthrough
+            or response.is_streamed
+            or response.mimetype != 'application/json'
+            or 'Content-Encoding' in response.headers):
+        return response
+    
+    accepted = request.accept_encodings
+    if brotli is not None and accepted['br']:
+        encoding = 'br'
+    elif accepted['gzip']:
+        encoding = 'gzip'
+    else:
+        return response
+    
+    data = response.get_data()
+    if len(data) < Config.COMPRESS_MIN_SIZE:
+        return response
+    
+    if encoding == 'br':
+        # Low qualities compress JSON well for a fraction of the CPU of 11
+        response.set_data(brotli.compress(data, quality=Config.BROTLI_QUALITY))
+    else:
+        # mtime=0 keeps the output deterministic for identical payloads
+        response.set_data(gzip.compress(data, compresslevel=Config.COMPRESS_LEVEL, mtime=0))
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
 
-# Configure CORS
-CORS(app, origins=Config.CORS_ORIGINS)
+@app.after_request
+def conditional_get(response):
+    """ETag successful GETs so unchanged bodies (e.g. the cached /health report) revalidate as 304"""
+    # Registered after compress_response, so this runs first and hashes the uncompressed body
+    if (request.method != 'GET'
+            or response.status_code != 200
+            or response.direct_passthrough
+            or response.is_streamed):
+        return response
+    
+    # Weak because the gzip and identity encodings share one tag
+    response.add_etag(weak=True)
+    return response.make_conditional(request)
 
 def initialize_services():
     """Initialize all services with proper error handling"""
@@ -38,7 +103,7 @@ def initialize_services():
         services['database'] = PropertyDatabase(Config.DATABASE_PATH)
         logger.info("✅ Database service initialized")
     except Exception as e:
-        logger.error(f"❌ Database initialization failed: {e}")
+        logger.error("❌ Database initialization failed: %s", e)
         services['database'] = None
     
     # LLM Service
@@ -46,7 +111,7 @@ def initialize_services():
         services['llm'] = LLMService()
         logger.info("✅ LLM service initialized")
     except Exception as e:
-        logger.error(f"❌ LLM service initialization failed: {e}")
+        logger.error("❌ LLM service initialization failed: %s", e)
         services['llm'] = None
     
     # Property Analysis Service
@@ -55,7 +120,7 @@ def initialize_services():
             services['property'] = PropertyAnalysisService(services['llm'])
             logger.info("✅ Property analysis service initialized")
         except Exception as e:
-            logger.error(f"❌ Property service initialization failed: {e}")
+            logger.error("❌ Property service initialization failed: %s", e)
             services['property'] = None
     else:
         services['property'] = None
@@ -65,46 +130,52 @@ def initialize_services():
         services['health'] = HealthChecker(services)
         logger.info("✅ Health checker initialized")
     except Exception as e:
-        logger.error(f"❌ Health checker initialization failed: {e}")
+        logger.error("❌ Health checker initialization failed: %s", e)
         services['health'] = None
     
     # Log service summary
     available_services = [name for name, service in services.items() if service is not None]
-    logger.info(f"🚀 Services initialized: {', '.join(available_services)}")
+    logger.info("🚀 Services initialized: %s", ', '.join(available_services))
     
     return services
 
 # Initialize services
 services = initialize_services()
 
+# Static part of the index payload, built once; index() only adds live fields
+API_INFO = {
+    'name': 'Brisbane Property Intelligence API',
+    'version': '2.0.0',
+    'description': 'Professional multi-LLM Brisbane property analysis system',
+    'features': (
+        'Professional Multi-LLM Integration',
+        'Claude & Gemini Support',
+        'Database Storage & Analytics',
+        'Query History Management',
+        'Brisbane Property Focus',
+        'Comprehensive Health Monitoring',
+        'Professional Error Handling'
+    ),
+    'preset_questions': tuple(Config.PRESET_QUESTIONS),
+    'api_endpoints': {
+        'analyze': 'POST /api/property/analyze',
+        'analyze_stream': 'GET|POST /api/property/analyze/stream',
+        'questions': 'GET /api/property/questions',
+        'history': 'GET /api/property/history',
+        'stats': 'GET /api/property/stats',
+        'health': 'GET /health'
+    }
+}
+
 @app.route('/')
 def index():
     """Brisbane Property Intelligence API information"""
-    return jsonify({
-        'name': 'Brisbane Property Intelligence API',
-        'version': '2.0.0',
-        'status': 'running',
-        'timestamp': datetime.now().isoformat(),
-        'description': 'Professional multi-LLM Brisbane property analysis system',
-        'features': [
-            'Professional Multi-LLM Integration',
-            'Claude & Gemini Support',
-            'Database Storage & Analytics',
-            'Query History Management',
-            'Brisbane Property Focus',
-            'Comprehensive Health Monitoring',
-            'Professional Error Handling'
-        ],
-        'services': services['health'].get_service_status() if services['health'] else {},
-        'preset_questions': Config.PRESET_QUESTIONS,
-        'api_endpoints': {
-            'analyze': 'POST /api/property/analyze',
-            'questions': 'GET /api/property/questions',
-            'history': 'GET /api/property/history',
-            'stats': 'GET /api/property/stats',
-            'health': 'GET /health'
-        }
-    })
+    return jsonify(dict(
+        API_INFO,
+        status='running',
+        timestamp=now_iso(),
+        services=services['health'].get_service_status() if services['health'] else {}
+    ))
 
 @app.route('/health')
 def health():
@@ -113,10 +184,12 @@ def health():
         return jsonify({
             'status': 'error',
             'error': 'Health checker not available',
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 500
     
-    return jsonify(services['health'].get_comprehensive_health())
+    response = jsonify(services['health'].get_comprehensive_health())
+    response.headers['Cache-Control'] = f'public, max-age={Config.HEALTH_CACHE_TTL}'
+    return response
 
 @app.route('/health/deep', methods=['GET'])
 def deep_health_check():
@@ -155,104 +228,249 @@ def get_property_questions():
                             'count': item['count']
                         })
             except Exception as e:
-                logger.error(f"Failed to get popular questions: {e}")
+                logger.error("Failed to get popular questions: %s", e)
         
         return jsonify({
             'success': True,
             'questions': questions,
             'preset_questions': Config.PRESET_QUESTIONS,
             'total_count': len(questions),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         })
         
     except Exception as e:
-        logger.error(f"Get questions error: {e}")
+        logger.error("Get questions error: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
+def _analysis_unavailable():
+    """Error response when the analysis pipeline cannot take requests, else None"""
+    if not services['property']:
+        return jsonify({
+            'success': False,
+            'error': 'Property analysis service not available',
+            'details': 'LLM services may not be configured correctly'
+        }), 500
+    
+    # Fail fast while every provider's circuit breaker is open
+    retry_after = services['llm'].get_retry_after()
+    if retry_after:
+        response = jsonify({
+            'success': False,
+            'error': 'circuit_open',
+            'details': 'LLM providers are failing; retry later',
+            'retry_after': retry_after,
+            'timestamp': now_iso()
+        })
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 503
+    
+    return None
+
+def _read_question(data):
+    """Validate the question in a request payload, returning (question, error_response)"""
+    question = data.get('question')
+    question = question.strip() if isinstance(question, str) else ''
+    if not question:
+        return None, (jsonify({
+            'success': False,
+            'error': 'Question is required'
+        }), 400)
+    
+    if len(question) > Config.MAX_QUESTION_LENGTH:
+        return None, (jsonify({
+            'success': False,
+            'error': f'Question must be at most {Config.MAX_QUESTION_LENGTH} characters'
+        }), 413)
+    
+    return question, None
+
+def _build_analysis_response(question, result, processing_time, include_details=False):
+    """Store a completed analysis and shape it for the API response"""
+    # Store in database if available
+    query_id = None
+    if services['database'] and result['success']:
+        try:
+            query_id = services['database'].store_query(
+                question=question,
+                answer=result['final_answer'],
+                question_type=result['question_type'],
+                processing_time=processing_time,
+                success=result['success']
+            )
+            logger.info("💾 Query stored with ID: %s", query_id)
+        except Exception as e:
+            logger.error("Failed to store query: %s", e)
+    
+    # Add summary for quick overview
+    analysis_summary = services['property'].get_analysis_summary(result) if services['property'] else {}
+    
+    response = {
+        'success': result['success'],
+        'question': question,
+        'question_type': result['question_type'],
+        'answer': result['final_answer'],
+        'processing_time': round(processing_time, 2),
+        'query_id': query_id,
+        'processing_stages': result['processing_stages'],
+        'analysis_summary': analysis_summary,
+        'cached': result.get('cached', False),
+        'timestamp': now_iso()
+    }
+    
+    # Include detailed results if requested
+    if include_details:
+        response['detailed_results'] = {
+            'claude_result': result.get('claude_result'),
+            'gemini_result': result.get('gemini_result'),
+            'data_sources': result.get('data_sources')
+        }
+    
+    return response
+
+def _sse_event(event, payload):
+    """Format one server-sent event with a JSON data line"""
+    return f"event: {event}\ndata: {app.json.dumps(payload)}\n\n"
+
+def _sse_error_response(response, status):
+    """Re-send a JSON error response as a single SSE 'error' event with a 200 status"""
+    payload = dict(response.get_json(), status=status)
+    sse_response = Response(_sse_event('error', payload), mimetype='text/event-stream')
+    sse_response.headers['Cache-Control'] = 'no-cache'
+    return sse_response
+
 @app.route('/api/property/analyze', methods=['POST'])
 def analyze_property_question():
     """Analyze Brisbane property question using professional pipeline"""
+    # silent=True returns None for missing or malformed JSON instead of raising;
+    # oversized bodies still raise here and reach the 413 handler
+    data = request.get_json(silent=True)
+    
     try:
-        data = request.get_json()
-        if not data:
+        if not isinstance(data, dict):
             return jsonify({
                 'success': False,
                 'error': 'Request body must be JSON'
             }), 400
         
-        question = data.get('question', '').strip()
-        if not question:
-            return jsonify({
-                'success': False,
-                'error': 'Question is required'
-            }), 400
+        question, error = _read_question(data)
+        if error:
+            return error
         
-        if not services['property']:
-            return jsonify({
-                'success': False,
-                'error': 'Property analysis service not available',
-                'details': 'LLM services may not be configured correctly'
-            }), 500
+        unavailable = _analysis_unavailable()
+        if unavailable:
+            return unavailable
         
-        logger.info(f"🔍 Processing property question: {question}")
+        logger.info("🔍 Processing property question: %s", question)
         start_time = time.time()
         
         # Use professional property analysis service
         result = services['property'].analyze_property_question(question)
         processing_time = time.time() - start_time
         
-        # Store in database if available
-        query_id = None
-        if services['database'] and result['success']:
-            try:
-                query_id = services['database'].store_query(
-                    question=question,
-                    answer=result['final_answer'],
-                    question_type=result['question_type'],
-                    processing_time=processing_time,
-                    success=result['success']
-                )
-                logger.info(f"💾 Query stored with ID: {query_id}")
-            except Exception as e:
-                logger.error(f"Failed to store query: {e}")
-        
-        # Add summary for quick overview
-        analysis_summary = services['property'].get_analysis_summary(result) if services['property'] else {}
+        response = _build_analysis_response(
+            question, result, processing_time, data.get('include_details')
+        )
         
-        response = {
-            'success': result['success'],
-            'question': question,
-            'question_type': result['question_type'],
-            'answer': result['final_answer'],
-            'processing_time': round(processing_time, 2),
-            'query_id': query_id,
-            'processing_stages': result['processing_stages'],
-            'analysis_summary': analysis_summary,
-            'timestamp': datetime.now().isoformat()
-        }
-        
-        # Include detailed results if requested
-        if data.get('include_details'):
-            response['detailed_results'] = {
-                'claude_result': result.get('claude_result'),
-                'gemini_result': result.get('gemini_result'),
-                'data_sources': result.get('data_sources')
-            }
-        
-        logger.info(f"✅ Analysis completed in {processing_time:.2f}s")
-        return jsonify(response)
+        logger.info("✅ Analysis completed in %.2fs", processing_time)
+        response = jsonify(response)
+        response.headers['X-Cache'] = 'HIT' if result.get('cached') else 'MISS'
+        return response
         
     except Exception as e:
-        logger.error(f"❌ Property analysis error: {e}")
+        logger.error("❌ Property analysis error: %s", e)
         return jsonify({
             'success': False,
             'error': str(e),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         }), 500
 
+@app.route('/api/property/analyze/stream', methods=['GET', 'POST'])
+def stream_property_analysis():
+    """Stream the analysis as server-sent events while Claude and Gemini generate it"""
+    # GET lets browsers use EventSource; POST accepts the same JSON body as /analyze
+    if request.method == 'POST':
+        data = request.get_json(silent=True)
+    else:
+        data = request.args
+    
+    if not isinstance(data, dict):
+        data = {}
+    
+    question, error = _read_question(data)
+    if not error:
+        error = _analysis_unavailable()
+    if error:
+        # EventSource can't read non-2xx bodies, so GET clients get the reason as an event
+        if request.method == 'GET':
+            return _sse_error_response(*error)
+        return error
+    
+    logger.info("🔍 Streaming property question: %s", question)
+    
+    def generate():
+        start_time = time.time()
+        try:
+            for event, payload in services['property'].stream_property_question(question):
+                if event == 'result':
+                    processing_time = time.time() - start_time
+                    payload = _build_analysis_response(question, payload, processing_time)
+                    logger.info("✅ Streamed analysis completed in %.2fs", processing_time)
+                yield _sse_event(event, payload)
+        except Exception as e:
+            logger.error("❌ Streaming analysis error: %s", e)
+            yield _sse_event('error', {
+                'success': False,
+                'error': str(e),
+                'timestamp': now_iso()
+            })
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def _read_paging(args, default_limit=50, max_limit=1000):
+    """Clamp limit/offset query parameters to valid values"""
+    limit = args.get('limit', default_limit, type=int)
+    offset = args.get('offset', 0, type=int)
+    
+    if limit > max_limit:
+        limit = max_limit
+    if limit < 1:
+        limit = 10
+    if offset < 0:
+        offset = 0
+    
+    return limit, offset
+
+def _read_since(args):
+    """Parse the optional ISO 8601 'since' parameter, returning (since, error_response)
+
+    Naive values are taken as UTC, because created_at is stored by SQLite as
+    naive UTC text. The API's own 'timestamp' fields are server-local time, so
+    send them back with an explicit offset (e.g. +10:00) or convert to UTC.
+    Aware values are converted to UTC and formatted like created_at.
+    """
+    raw = args.get('since')
+    if not raw:
+        return None, None
+    
+    try:
+        since = datetime.fromisoformat(raw)
+    except ValueError:
+        return None, (jsonify({
+            'success': False,
+            'error': 'since must be an ISO 8601 timestamp (UTC unless it carries an offset)'
+        }), 400)
+    
+    if since.tzinfo is not None:
+        since = since.astimezone(timezone.utc).replace(tzinfo=None)
+    return since.strftime('%Y-%m-%d %H:%M:%S'), None
+
 @app.route('/api/property/history', methods=['GET'])
 def get_property_history():
     """Get query history from database"""
@@ -263,16 +481,12 @@ def get_property_history():
         }), 500
     
     try:
-        limit = request.args.get('limit', 50, type=int)
-        offset = request.args.get('offset', 0, type=int)
-        
-        # Validate parameters
-        if limit > 1000:
-            limit = 1000
-        if limit < 1:
-            limit = 10
+        limit, offset = _read_paging(request.args)
+        since, error = _read_since(request.args)
+        if error:
+            return error
         
-        history = services['database'].get_query_history(limit)
+        history = services['database'].get_query_history(limit, offset, since)
         
         return jsonify({
             'success': True,
@@ -280,11 +494,11 @@ def get_property_history():
             'count': len(history),
             'limit': limit,
             'offset': offset,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': now_iso()
         })
         
     except Exception as e:
-        logger.error(f"Get history error: {e}")
+        logger.error("Get history error: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -294,8 +508,9 @@ def get_property_history():
 def get_property_stats():
     """Get comprehensive database and system statistics"""
     try:
+        timestamp = now_iso()
         stats = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': timestamp,
             'system_info': {
                 'version': '2.0.0',
                 'python_version': sys.version.split()[0],
@@ -336,11 +551,11 @@ def get_property_stats():
         return jsonify({
             'success': True,
             'stats': stats,
-            'timestamp': datetime.now().isoformat()
+            'timestamp': timestamp
         })
         
     except Exception as e:
-        logger.error(f"Get stats error: {e}")
+        logger.error("Get stats error: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
@@ -356,55 +571,65 @@ def reset_property_database():
         }), 500
     
     try:
-        # Get current stats before reset
-        pre_reset_stats = services['database'].get_database_stats()
+        # Rows actually deleted (cached stats can lag other workers' inserts)
+        cleared_queries = services['database'].clear_all_data()
         
-        # Perform reset
-        services['database'].clear_all_data()
-        
-        logger.info(f"🗑️ Database reset completed. Cleared {pre_reset_stats.get('total_queries', 0)} queries")
+        logger.info("🗑️ Database reset completed. Cleared %s queries", cleared_queries)
         
         return jsonify({
             'success': True,
             'message': 'Database reset successfully',
-            'cleared_queries': pre_reset_stats.get('total_queries', 0),
-            'timestamp': datetime.now().isoformat()
+            'cleared_queries': cleared_queries,
+            'timestamp': now_iso()
         })
         
     except Exception as e:
-        logger.error(f"Reset database error: {e}")
+        logger.error("Reset database error: %s", e)
         return jsonify({
             'success': False,
             'error': str(e)
         }), 500
 
 # Error handlers
+
+# Static body, serialized once (404s from scanners and typos are frequent)
+NOT_FOUND_BODY = app.json.dumps({
+    'success': False,
+    'error': 'Endpoint not found',
+    'available_endpoints': [
+        'GET /',
+        'GET /health',
+        'GET /api/property/questions',
+        'POST /api/property/analyze',
+        'GET|POST /api/property/analyze/stream',
+        'GET /api/property/history',
+        'GET /api/property/stats',
+        'POST /api/property/reset'
+    ]
+})
+
 @app.errorhandler(404)
 def not_found(error):
+    return app.response_class(NOT_FOUND_BODY, status=404, mimetype='application/json')
+
+@app.errorhandler(413)
+def payload_too_large(error):
     return jsonify({
         'success': False,
-        'error': 'Endpoint not found',
-        'available_endpoints': [
-            'GET /',
-            'GET /health',
-            'GET /api/property/questions',
-            'POST /api/property/analyze',
-            'GET /api/property/history',
-            'GET /api/property/stats',
-            'POST /api/property/reset'
-        ]
-    }), 404
+        'error': f'Request body exceeds {Config.MAX_CONTENT_LENGTH} bytes'
+    }), 413
 
 @app.errorhandler(500)
 def internal_error(error):
-    logger.error(f"Internal server error: {error}")
+    logger.error("Internal server error: %s", error)
     return jsonify({
         'success': False,
         'error': 'Internal server error',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': now_iso()
     }), 500
 
 if __name__ == '__main__':
+    # Local development only - production runs under gunicorn (see railway.json)
     # Validate configuration before starting
     if not Config.validate_config():
         logger.warning("⚠️ Configuration validation failed - some features may not work")
@@ -413,9 +638,9 @@ if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
     debug_mode = os.environ.get('FLASK_ENV') == 'development'
     
-    logger.info(f"🚀 Starting Brisbane Property Intelligence API v2.0")
-    logger.info(f"📡 Port: {port}")
-    logger.info(f"🔧 Debug: {debug_mode}")
-    logger.info(f"🤖 Available LLM providers: {Config.get_enabled_llm_providers()}")
+    logger.info("🚀 Starting Brisbane Property Intelligence API v2.0")
+    logger.info("📡 Port: %s", port)
+    logger.info("🔧 Debug: %s", debug_mode)
+    logger.info("🤖 Available LLM providers: %s", Config.get_enabled_llm_providers())
     
     app.run(host='0.0.0.0', port=port, debug=debug_mode)
\ No newline at end of file
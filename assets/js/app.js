@@ -309,21 +309,26 @@ class BrisbanePropertyApp {
             debugLog('🔍 Starting analysis for:', questionToAnalyze);
             const startTime = performance.now();
             
-            const requestConfig = getApiConfig({
-                method: 'POST',
-                body: JSON.stringify({
-                    question: questionToAnalyze,
-                    include_details: false
-                })
-            });
-            
-            const response = await fetch(getApiEndpoint('analyze'), requestConfig);
-            
-            if (!response.ok) {
-                throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+            let result;
+            if (isFeatureEnabled('streamingResults') && window.EventSource) {
+                result = await this.streamAnalysis(questionToAnalyze);
+            } else {
+                const requestConfig = getApiConfig({
+                    method: 'POST',
+                    body: JSON.stringify({
+                        question: questionToAnalyze,
+                        include_details: false
+                    })
+                });
+                
+                const response = await fetch(getApiEndpoint('analyze'), requestConfig);
+                
+                if (!response.ok) {
+                    throw new Error(`HTTP ${response.status}: ${response.statusText}`);
+                }
+                
+                result = await response.json();
             }
-            
-            const result = await response.json();
             const duration = performance.now() - startTime;
             
             performanceLog('Property analysis', duration);
@@ -344,6 +349,64 @@ class BrisbanePropertyApp {
         }
     }
     
+    /**
+     * Stream analysis over server-sent events, rendering the answer as it arrives
+     */
+    streamAnalysis(question) {
+        return new Promise((resolve, reject) => {
+            const url = `${getApiEndpoint('analyzeStream')}?question=${encodeURIComponent(question)}`;
+            const source = new EventSource(url);
+            let stage = null;
+            let answer = '';
+            
+            source.addEventListener('delta', (event) => {
+                const delta = JSON.parse(event.data);
+                // Claude's research streams first, then Gemini's answer replaces it
+                if (delta.stage !== stage) {
+                    stage = delta.stage;
+                    answer = '';
+                }
+                answer += delta.text;
+                this.displayStreamingAnswer(answer);
+            });
+            
+            source.addEventListener('result', (event) => {
+                source.close();
+                resolve(JSON.parse(event.data));
+            });
+            
+            source.addEventListener('error', (event) => {
+                source.close();
+                // Server-sent error events carry data; dropped connections do not
+                if (!event.data) {
+                    reject(new Error('Streaming connection failed'));
+                    return;
+                }
+                
+                const error = JSON.parse(event.data);
+                if (error.error === 'circuit_open') {
+                    reject(new Error(`${error.details} (retry in ${error.retry_after}s)`));
+                } else {
+                    reject(new Error(error.error));
+                }
+            });
+        });
+    }
+    
+    /**
+     * Show the partial answer while it is streaming
+     */
+    displayStreamingAnswer(answer) {
+        const resultsContent = document.getElementById('resultsContent');
+        if (!resultsContent) return;
+        
+        resultsContent.innerHTML = `
+            <div class="analysis-result">
+                ${this.convertMarkdownToHTML(answer)}
+            </div>
+        `;
+    }
+    
     /**
      * Set analyze button state (loading/normal)
      */
@@ -36,6 +36,7 @@ const APP_CONFIG = {
             healthDeep: '/health/deep',
             questions: '/api/property/questions',
             analyze: '/api/property/analyze',
+            analyzeStream: '/api/property/analyze/stream',
             history: '/api/property/history',
             stats: '/api/property/stats',
             reset: '/api/property/reset'
@@ -67,6 +68,7 @@ const APP_CONFIG = {
             notifications: true,
             loadingOverlay: true,
             animatedResults: true,
+            streamingResults: true, // Render the answer as it is generated (SSE)
             soundEffects: false
         },
         
@@ -19,6 +19,19 @@ class Config:
     # LLM Configuration
     LLM_TIMEOUT = int(os.getenv('LLM_TIMEOUT', '30'))
     LLM_MAX_RETRIES = int(os.getenv('LLM_MAX_RETRIES', '3'))
+    LLM_PROBE_TIMEOUT = int(os.getenv('LLM_PROBE_TIMEOUT', '10'))
+    LLM_RETRY_MAX_BACKOFF = float(os.getenv('LLM_RETRY_MAX_BACKOFF', '4'))
+    # In-flight calls allowed per provider in each worker process
+    LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', '8'))
+    
+    # Upstream HTTP connection pool
+    HTTP_MAX_CONNECTIONS = int(os.getenv('HTTP_MAX_CONNECTIONS', '64'))
+    HTTP_MAX_KEEPALIVE = int(os.getenv('HTTP_MAX_KEEPALIVE', '32'))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '60'))
+    
+    # Circuit breaker (per LLM provider)
+    CIRCUIT_FAIL_MAX = int(os.getenv('CIRCUIT_FAIL_MAX', '5'))
+    CIRCUIT_RESET_TIMEOUT = int(os.getenv('CIRCUIT_RESET_TIMEOUT', '30'))
     
     # Claude Models (in priority order)
     CLAUDE_MODELS = [
@@ -34,25 +47,55 @@ class Config:
         'gemini-pro'
     ]
     
+    # Environment
+    DEV_MODE = os.getenv('FLASK_ENV') == 'development'
+    # Production defaults to WARNING so per-request INFO logging is skipped
+    LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO' if DEV_MODE else 'WARNING').upper()
+    
     # Feature Flags
     CLAUDE_ENABLED = os.getenv('CLAUDE_ENABLED', 'true').lower() == 'true'
     GEMINI_ENABLED = os.getenv('GEMINI_ENABLED', 'true').lower() == 'true'
     
+    # Analysis response cache
+    RESPONSE_CACHE_SIZE = int(os.getenv('RESPONSE_CACHE_SIZE', '256'))
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '3600'))
+    # Answers where only one provider succeeded
+    RESPONSE_CACHE_PARTIAL_TTL = int(os.getenv('RESPONSE_CACHE_PARTIAL_TTL', '60'))
+    
+    # Health check cache (seconds)
+    HEALTH_CACHE_TTL = int(os.getenv('HEALTH_CACHE_TTL', '5'))
+    
+    # Query-history aggregates (popular questions) cache (seconds)
+    ANALYTICS_CACHE_TTL = int(os.getenv('ANALYTICS_CACHE_TTL', '30'))
+    
+    # Response compression
+    COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '1024'))
+    COMPRESS_LEVEL = int(os.getenv('COMPRESS_LEVEL', '6'))
+    # Used instead of gzip when the Brotli package is installed and accepted
+    BROTLI_QUALITY = int(os.getenv('BROTLI_QUALITY', '4'))
+    
+    # Request limits
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', str(64 * 1024)))
+    MAX_QUESTION_LENGTH = int(os.getenv('MAX_QUESTION_LENGTH', '2000'))
+    
     # Database
     DATABASE_PATH = os.getenv('DATABASE_PATH', 'property_intelligence.db')
+    # Seconds a connection waits on another worker's write lock before failing
+    DB_BUSY_TIMEOUT = float(os.getenv('DB_BUSY_TIMEOUT', '10'))
     
-    # CORS
-    CORS_ORIGINS = [
+    # CORS - exact origins only (browsers never send a path in Origin)
+    CORS_ORIGINS = frozenset([
         'https://curam-ai.com.au',
-        'https://curam-ai.com.au/python-hub/',
-        'https://curam-ai.com.au/ai-intelligence/',
         'http://localhost:3000',
         'http://localhost:8000'
-    ]
-    
-    # Add development origins if in development
-    if os.getenv('FLASK_ENV') == 'development':
-        CORS_ORIGINS.append('*')
+    ] + [
+        origin.strip().rstrip('/')
+        for origin in os.getenv('CORS_EXTRA_ORIGINS', '').split(',')
+        if origin.strip()
+    ])
+    CORS_ALLOW_METHODS = 'GET, POST, OPTIONS'
+    # How long browsers may reuse a preflight result (Chromium caps this at 2h)
+    CORS_MAX_AGE = int(os.getenv('CORS_MAX_AGE', '86400'))
     
     # Brisbane Property Questions
     PRESET_QUESTIONS = [
@@ -90,7 +133,7 @@ class Config:
             issues.append("LLM_TIMEOUT too low (minimum 5 seconds)")
         
         if issues:
-            logger.warning(f"Configuration issues: {', '.join(issues)}")
+            logger.warning("Configuration issues: %s", ', '.join(issues))
         
         return len(issues) == 0
     
@@ -108,11 +151,11 @@ class Config:
     def log_config_status(cls):
         """Log configuration status for debugging"""
         logger.info("=== Configuration Status ===")
-        logger.info(f"Claude Enabled: {cls.CLAUDE_ENABLED}")
-        logger.info(f"Claude API Key: {'✓' if cls.CLAUDE_API_KEY else '✗'}")
-        logger.info(f"Gemini Enabled: {cls.GEMINI_ENABLED}")
-        logger.info(f"Gemini API Key: {'✓' if cls.GEMINI_API_KEY else '✗'}")
-        logger.info(f"LLM Timeout: {cls.LLM_TIMEOUT}s")
-        logger.info(f"Database Path: {cls.DATABASE_PATH}")
-        logger.info(f"Enabled Providers: {cls.get_enabled_llm_providers()}")
+        logger.info("Claude Enabled: %s", cls.CLAUDE_ENABLED)
+        logger.info("Claude API Key: %s", '✓' if cls.CLAUDE_API_KEY else '✗')
+        logger.info("Gemini Enabled: %s", cls.GEMINI_ENABLED)
+        logger.info("Gemini API Key: %s", '✓' if cls.GEMINI_API_KEY else '✗')
+        logger.info("LLM Timeout: %ss", cls.LLM_TIMEOUT)
+        logger.info("Database Path: %s", cls.DATABASE_PATH)
+        logger.info("Enabled Providers: %s", cls.get_enabled_llm_providers())
         logger.info("=" * 30)
@@ -1,22 +1,54 @@
 import sqlite3
 import json
 import logging
+import threading
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from config import Config
+from utils.ttl_cache import TTLCache
+
 logger = logging.getLogger(__name__)
 
 class PropertyDatabase:
     def __init__(self, db_path: str = 'property_intelligence.db'):
         self.db_path = db_path
+        # One connection per thread, reused across requests
+        self._local = threading.local()
+        # Aggregates re-scan the whole table, so serve them from memory briefly
+        self._aggregate_cache = TTLCache(maxsize=16, ttl=Config.ANALYTICS_CACHE_TTL)
         self.init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Get this thread's connection, opening it on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=Config.DB_BUSY_TIMEOUT)
+            # WAL (set in init_database) makes fsync on checkpoint enough
+            conn.execute('PRAGMA synchronous=NORMAL')
+            # GROUP BY / ORDER BY scratch space stays off disk
+            conn.execute('PRAGMA temp_store=MEMORY')
+            self._local.conn = conn
+        return conn
+    
+    def _write(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run a write in its own transaction (commit on success, rollback on error)"""
+        conn = self._connect()
+        # SQLite's busy handler already waits up to DB_BUSY_TIMEOUT for the lock
+        with conn:
+            return conn.execute(sql, params)
+    
     def init_database(self):
         """Initialize database tables"""
         try:
-            conn = sqlite3.connect(self.db_path)
+            # Throwaway connection: under gunicorn --preload this runs in the
+            # master, whose connections must not leak into forked workers
+            conn = sqlite3.connect(self.db_path, timeout=Config.DB_BUSY_TIMEOUT)
             cursor = conn.cursor()
             
+            # WAL lets readers proceed while a query is being stored
+            cursor.execute('PRAGMA journal_mode=WAL')
+            
             # Main queries table
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS property_queries (
@@ -30,53 +62,73 @@ class PropertyDatabase:
                 )
             ''')
             
+            # Covers the popular-questions aggregate: rows arrive grouped by
+            # question and MAX(created_at) is read from the index alone
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_queries_success_question
+                ON property_queries (success, question, created_at)
+            ''')
+            
+            # History pages newest-first; without this every page sorts the table
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_queries_created_at
+                ON property_queries (created_at DESC)
+            ''')
+            
             conn.commit()
             conn.close()
             logger.info("Database initialized successfully")
             
         except Exception as e:
-            logger.error(f"Database initialization failed: {str(e)}")
+            logger.error("Database initialization failed: %s", e)
             raise e
     
     def store_query(self, question: str, answer: str, question_type: str = 'custom', 
                    processing_time: float = 0, success: bool = True) -> int:
         """Store a query and its answer"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
+            cursor = self._write('''
                 INSERT INTO property_queries (question, question_type, answer, processing_time, success)
                 VALUES (?, ?, ?, ?, ?)
             ''', (question, question_type, answer, processing_time, success))
             
             query_id = cursor.lastrowid
-            conn.commit()
-            conn.close()
+            # New row changes every aggregate; don't serve stale counts
+            self._aggregate_cache.clear()
             
-            logger.info(f"Stored query with ID: {query_id}")
+            logger.info("Stored query with ID: %s", query_id)
             return query_id
             
         except Exception as e:
-            logger.error(f"Failed to store query: {str(e)}")
+            logger.error("Failed to store query: %s", e)
             raise e
     
-    def get_query_history(self, limit: int = 50) -> List[Dict]:
-        """Get recent query history"""
+    def get_query_history(self, limit: int = 50, offset: int = 0,
+                          since: Optional[str] = None) -> List[Dict]:
+        """Get recent query history, optionally only rows created after since"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('''
-                SELECT id, question, question_type, answer, success, 
-                       processing_time, created_at
-                FROM property_queries
-                ORDER BY created_at DESC
-                LIMIT ?
-            ''', (limit,))
+            cursor = self._connect().cursor()
+            
+            # Both branches walk idx_queries_created_at, so LIMIT stops early
+            if since:
+                cursor.execute('''
+                    SELECT id, question, question_type, answer, success, 
+                           processing_time, created_at
+                    FROM property_queries
+                    WHERE created_at > ?
+                    ORDER BY created_at DESC
+                    LIMIT ? OFFSET ?
+                ''', (since, limit, offset))
+            else:
+                cursor.execute('''
+                    SELECT id, question, question_type, answer, success, 
+                           processing_time, created_at
+                    FROM property_queries
+                    ORDER BY created_at DESC
+                    LIMIT ? OFFSET ?
+                ''', (limit, offset))
             
             results = cursor.fetchall()
-            conn.close()
             
             history = []
             for row in results:
@@ -93,14 +145,18 @@ class PropertyDatabase:
             return history
             
         except Exception as e:
-            logger.error(f"Failed to get query history: {str(e)}")
+            logger.error("Failed to get query history: %s", e)
             return []
     
     def get_popular_questions(self, limit: int = 10) -> List[Dict]:
-        """Get most frequently asked questions"""
+        """Get most frequently asked questions (cached for ANALYTICS_CACHE_TTL seconds)"""
+        cache_key = ('popular_questions', limit)
+        cached = self._aggregate_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._connect().cursor()
             
             cursor.execute('''
                 SELECT question, COUNT(*) as count, MAX(created_at) as last_asked
@@ -112,7 +168,6 @@ class PropertyDatabase:
             ''', (limit,))
             
             results = cursor.fetchall()
-            conn.close()
             
             questions = []
             for row in results:
@@ -122,49 +177,54 @@ class PropertyDatabase:
                     'last_asked': row[2]
                 })
             
+            self._aggregate_cache.set(cache_key, questions)
             return questions
             
         except Exception as e:
-            logger.error(f"Failed to get popular questions: {str(e)}")
+            logger.error("Failed to get popular questions: %s", e)
             return []
     
     def get_database_stats(self) -> Dict:
-        """Get database statistics"""
+        """Get database statistics (cached for ANALYTICS_CACHE_TTL seconds)"""
+        cache_key = ('database_stats',)
+        cached = self._aggregate_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute('SELECT COUNT(*) FROM property_queries')
-            total_queries = cursor.fetchone()[0]
-            
-            cursor.execute('SELECT COUNT(*) FROM property_queries WHERE success = 1')
-            successful_queries = cursor.fetchone()[0]
+            cursor = self._connect().cursor()
             
-            cursor.execute('SELECT AVG(processing_time) FROM property_queries WHERE processing_time IS NOT NULL')
-            avg_processing_time = cursor.fetchone()[0] or 0
-            
-            conn.close()
+            # One pass over the table instead of three
+            cursor.execute('''
+                SELECT COUNT(*),
+                       COUNT(CASE WHEN success = 1 THEN 1 END),
+                       AVG(processing_time)
+                FROM property_queries
+            ''')
+            total_queries, successful_queries, avg_processing_time = cursor.fetchone()
+            avg_processing_time = avg_processing_time or 0
             
-            return {
+            stats = {
                 'total_queries': total_queries,
                 'successful_queries': successful_queries,
                 'success_rate': (successful_queries / total_queries * 100) if total_queries > 0 else 0,
                 'avg_processing_time': round(avg_processing_time, 2)
             }
             
+            self._aggregate_cache.set(cache_key, stats)
+            return stats
+            
         except Exception as e:
-            logger.error(f"Failed to get database stats: {str(e)}")
+            logger.error("Failed to get database stats: %s", e)
             return {}
     
-    def clear_all_data(self):
-        """Clear all data from the database"""
+    def clear_all_data(self) -> int:
+        """Clear all data from the database, returning the number of rows deleted"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-            cursor.execute('DELETE FROM property_queries')
-            conn.commit()
-            conn.close()
+            cleared = self._write('DELETE FROM property_queries').rowcount
+            self._aggregate_cache.clear()
             logger.info("Database cleared successfully")
+            return cleared
         except Exception as e:
-            logger.error(f"Failed to clear database: {str(e)}")
+            logger.error("Failed to clear database: %s", e)
             raise e
\ No newline at end of file
@@ -0,0 +1,23 @@
+"""
+Gunicorn configuration for Brisbane Property Intelligence
+Threaded workers: requests spend almost all their time waiting on LLM APIs
+"""
+
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+
+# Processes x threads = concurrent requests; tune per instance size
+worker_class = 'gthread'
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+threads = int(os.getenv('GUNICORN_THREADS', '8'))
+
+# Outlive the edge proxy's idle timeout so it never reuses a closed socket
+keepalive = int(os.getenv('GUNICORN_KEEPALIVE', '65'))
+timeout = int(os.getenv('GUNICORN_TIMEOUT', '300'))
+
+# Recycle workers periodically; jitter keeps them from restarting together
+max_requests = 1000
+max_requests_jitter = 100
+
+preload_app = True
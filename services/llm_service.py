@@ -4,166 +4,441 @@ Handles Claude and Gemini integration with proper error handling
 """
 
 import os
+import atexit
+import random
 import logging
+import threading
 import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
 from typing import Dict, Optional
 from config import Config
+from utils.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
+# Marks a provider client that has not been built yet (None means unavailable)
+_UNSET = object()
+
 class LLMService:
     """Professional LLM service with multiple providers"""
     
+    # Supported providers, in pipeline order
+    PROVIDERS = ('claude', 'gemini')
+    
+    # Connectivity probe sent by the deep health check
+    PROBE_MESSAGE = "Test connection"
+    
+    # Probe answers served locally in development so dashboard refreshes cost no tokens
+    CANNED_RESPONSES = {
+        ('claude', PROBE_MESSAGE): "Connection test received. Claude is reachable.",
+        ('gemini', PROBE_MESSAGE): "Connection test received. Gemini is reachable."
+    }
+    
     def __init__(self):
-        self.claude_client = None
-        self.gemini_model = None
+        self.http_client = None
+        # SDK clients are built on first access (see the properties below)
+        self._claude_client = _UNSET
+        self._gemini_model = _UNSET
         self.working_claude_model = None
         self.working_gemini_model = None
-        self._initialize_clients()
+        self.breakers = {
+            provider: CircuitBreaker(
+                provider,
+                fail_max=Config.CIRCUIT_FAIL_MAX,
+                reset_timeout=Config.CIRCUIT_RESET_TIMEOUT
+            )
+            for provider in self.PROVIDERS
+        }
+        # The Gemini SDK has no per-call timeout, so calls run on this pool
+        # and the request thread waits with a deadline. A timed-out call keeps
+        # its thread until gRPC gives up, so the pool has room for stalled calls
+        # on top of the LLM_MAX_CONCURRENCY live ones (threads start on demand)
+        self._gemini_executor = ThreadPoolExecutor(
+            max_workers=Config.LLM_MAX_CONCURRENCY * 4,
+            thread_name_prefix='gemini'
+        )
+        self._gemini_transient_errors = ()
+        # Errors meaning "this model name is unusable", so selection tries the next one
+        self._claude_model_errors = ()
+        self._gemini_model_errors = ()
+        self._genai = None
+        # Client construction and model selection run on first use, not at import
+        self._setup_locks = {provider: threading.RLock() for provider in self.PROVIDERS}
+        # Held while a model-selection probe is in flight; other requests don't wait on it
+        self._probe_locks = {provider: threading.Lock() for provider in self.PROVIDERS}
+        # Caps concurrent upstream calls so bursts queue here instead of hitting rate limits
+        self._slots = {
+            provider: threading.BoundedSemaphore(Config.LLM_MAX_CONCURRENCY)
+            for provider in self.PROVIDERS
+        }
+        atexit.register(self.close)
     
-    def _initialize_clients(self):
-        """Initialize LLM clients with proper error handling"""
-        if Config.CLAUDE_ENABLED:
-            self._init_claude()
-        
-        if Config.GEMINI_ENABLED:
-            self._init_gemini()
+    @property
+    def claude_client(self):
+        """Anthropic client, built on first access; None when unavailable"""
+        if self._claude_client is _UNSET:
+            with self._setup_locks['claude']:
+                if self._claude_client is _UNSET:
+                    self._claude_client = self._init_claude()
+        return self._claude_client
+    
+    @claude_client.setter
+    def claude_client(self, client):
+        self._claude_client = client
+    
+    @property
+    def gemini_model(self):
+        """Gemini model, built on first access; None when unavailable"""
+        if self._gemini_model is _UNSET:
+            with self._setup_locks['gemini']:
+                if self._gemini_model is _UNSET:
+                    self._gemini_model = self._init_gemini()
+        return self._gemini_model
+    
+    @gemini_model.setter
+    def gemini_model(self, model):
+        self._gemini_model = model
     
     def _init_claude(self):
         """Initialize Claude client with working models from your JS app"""
+        if not Config.CLAUDE_ENABLED:
+            return None
+        
         try:
             if not Config.CLAUDE_API_KEY:
                 logger.warning("Claude API key not configured")
-                return
+                return None
             
             import anthropic
+            import httpx
+            
+            # Keep idle connections to the API open between requests; httpx
+            # otherwise drops them after 5s and each call pays a new TLS handshake
+            self.http_client = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=Config.HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=Config.HTTP_MAX_KEEPALIVE,
+                    keepalive_expiry=Config.HTTP_KEEPALIVE_EXPIRY
+                ),
+                timeout=Config.LLM_TIMEOUT
+            )
             
             # Use explicit, minimal initialization
-            self.claude_client = anthropic.Anthropic(
+            client = anthropic.Anthropic(
                 api_key=Config.CLAUDE_API_KEY.strip(),
                 timeout=Config.LLM_TIMEOUT,
-                max_retries=Config.LLM_MAX_RETRIES
+                max_retries=Config.LLM_MAX_RETRIES,
+                http_client=self.http_client
             )
+            self._claude_model_errors = (anthropic.NotFoundError,)
             
-            # Test connection with models that work in your JS app
-            self._test_claude_connection()
-            logger.info(f"Claude client initialized with model: {self.working_claude_model}")
+            logger.info("Claude client initialized (model selected on first use)")
+            return client
             
         except ImportError:
             logger.error("anthropic library not installed")
-            self.claude_client = None
+            return None
         except Exception as e:
-            logger.error(f"Claude initialization failed: {e}")
-            self.claude_client = None
+            logger.error("Claude initialization failed: %s", e)
+            return None
     
     def _init_gemini(self):
         """Initialize Gemini client with working models from your other project"""
+        if not Config.GEMINI_ENABLED:
+            return None
+        
         try:
             if not Config.GEMINI_API_KEY:
                 logger.warning("Gemini API key not configured")
-                return
+                return None
             
             import google.generativeai as genai
+            from google.api_core import exceptions as google_exceptions
             genai.configure(api_key=Config.GEMINI_API_KEY.strip())
+            self._gemini_transient_errors = (
+                google_exceptions.ServiceUnavailable,
+                google_exceptions.InternalServerError,
+                google_exceptions.TooManyRequests
+            )
+            self._gemini_model_errors = (
+                google_exceptions.NotFound,
+                google_exceptions.InvalidArgument
+            )
             
-            # Test with models in priority order
-            for model_name in Config.GEMINI_MODELS:
-                try:
-                    self.gemini_model = genai.GenerativeModel(model_name)
-                    self._test_gemini_connection()
-                    self.working_gemini_model = model_name
-                    logger.info(f"Gemini initialized with model: {model_name}")
-                    break
-                except Exception as e:
-                    logger.warning(f"Gemini model {model_name} failed: {e}")
-                    continue
-            
-            if not self.working_gemini_model:
-                logger.error("No working Gemini models found")
-                self.gemini_model = None
+            # Placeholder model; no request is made until first use, when
+            # _ensure_gemini_ready() picks the first model that responds
+            self._genai = genai
+            model = genai.GenerativeModel(Config.GEMINI_MODELS[0])
+            logger.info("Gemini client initialized (model selected on first use)")
+            return model
             
         except ImportError:
             logger.error("google-generativeai library not installed")
-            self.gemini_model = None
+            return None
+        except Exception as e:
+            logger.error("Gemini initialization failed: %s", e)
+            return None
+    
+    def _is_available(self, provider: str) -> bool:
+        """Whether a provider can serve requests, without building its client"""
+        client = self._claude_client if provider == 'claude' else self._gemini_model
+        if client is _UNSET:
+            # Not built yet: available if it is enabled and has a key
+            return provider in Config.get_enabled_llm_providers()
+        return client is not None
+    
+    def _is_verified(self, provider: str) -> bool:
+        """Whether a provider's client is built and a model has answered a real call"""
+        if provider == 'claude':
+            return self._claude_client not in (_UNSET, None) and bool(self.working_claude_model)
+        return self._gemini_model not in (_UNSET, None) and bool(self.working_gemini_model)
+    
+    def _ensure_claude_ready(self) -> bool:
+        """Select a working Claude model on first use, retrying on later calls if it fails"""
+        if self.working_claude_model:
+            return True
+        if not self.claude_client:
+            return False
+        return self._select_model('claude', self._test_claude_connection)
+    
+    def _ensure_gemini_ready(self) -> bool:
+        """Select a working Gemini model on first use, retrying on later calls if it fails"""
+        if self.working_gemini_model:
+            return True
+        if not self.gemini_model:
+            return False
+        return self._select_model('gemini', self._test_gemini_connection)
+    
+    def _select_model(self, provider: str, probe) -> bool:
+        """Run a model-selection probe through the provider's circuit breaker.
+        The client is kept on failure, so the breaker's open/half-open cycle decides
+        when selection is retried. Returns False only when this probe failed."""
+        # Another request is probing: don't queue behind it, use the default model
+        if not self._probe_locks[provider].acquire(blocking=False):
+            return True
+        
+        try:
+            if provider == 'claude' and self.working_claude_model:
+                return True
+            if provider == 'gemini' and self.working_gemini_model:
+                return True
+            
+            with self.breakers[provider].guard():
+                probe()
+            logger.info("%s model selected: %s", provider.title(),
+                        self.working_claude_model if provider == 'claude' else self.working_gemini_model)
+            return True
+        except CircuitOpenError:
+            # Let the call itself go through the breaker and fail fast with retry_after
+            return True
         except Exception as e:
-            logger.error(f"Gemini initialization failed: {e}")
-            self.gemini_model = None
+            logger.error("%s model selection failed: %s", provider.title(), e)
+            return False
+        finally:
+            self._probe_locks[provider].release()
     
     def _test_claude_connection(self):
-        """Test Claude connection with minimal call using working models"""
+        """Pick the first Claude model that answers a minimal call"""
+        # SDK retries (LLM_MAX_RETRIES) stay on so a transient 529 doesn't fail selection
+        probe_client = self.claude_client.with_options(timeout=Config.LLM_PROBE_TIMEOUT)
         for model in Config.CLAUDE_MODELS:
             try:
-                response = self.claude_client.messages.create(
+                probe_client.messages.create(
                     model=model,
                     max_tokens=1,
                     messages=[{"role": "user", "content": "hi"}]
                 )
-                self.working_claude_model = model
-                return True
-            except Exception as e:
-                logger.warning(f"Claude model {model} test failed: {e}")
+            except self._claude_model_errors as e:
+                # Only an unknown model moves on; outages and timeouts fail the probe at once
+                logger.warning("Claude model %s unavailable: %s", model, e)
                 continue
+            self.working_claude_model = model
+            return True
         
         raise Exception("No working Claude models found")
     
     def _test_gemini_connection(self):
-        """Test Gemini connection with minimal call"""
-        response = self.gemini_model.generate_content("hi")
-        return True
+        """Pick the first Gemini model that answers a minimal call"""
+        for model_name in Config.GEMINI_MODELS:
+            # Probe a candidate; concurrent requests keep using the current model meanwhile
+            model = self._genai.GenerativeModel(model_name)
+            try:
+                self._generate_gemini("hi", timeout=Config.LLM_PROBE_TIMEOUT, model=model)
+            except self._gemini_model_errors as e:
+                logger.warning("Gemini model %s unavailable: %s", model_name, e)
+                continue
+            self.gemini_model = model
+            self.working_gemini_model = model_name
+            return True
+        
+        raise Exception("No working Gemini models found")
+    
+    def analyze(self, provider: str, question: str, context: str = "") -> Dict:
+        """Dispatch an analysis to the named provider"""
+        if provider == 'claude':
+            return self.analyze_with_claude(question)
+        if provider == 'gemini':
+            return self.analyze_with_gemini(question, context)
+        return self._error_response(f"Unknown LLM provider: {provider}")
     
     def analyze_with_claude(self, question: str) -> Dict:
         """Analyze question with Claude using working model"""
         if not self.claude_client:
             return self._error_response("Claude client not available")
         
-        try:
-            prompt = self._create_brisbane_prompt(question)
-            model = self.working_claude_model or Config.CLAUDE_MODELS[0]
-            
-            start_time = time.time()
-            response = self.claude_client.messages.create(
-                model=model,
-                max_tokens=1000,
-                messages=[{"role": "user", "content": prompt}]
-            )
-            processing_time = time.time() - start_time
-            
-            return {
-                'success': True,
-                'analysis': response.content[0].text,
-                'model_used': model,
-                'processing_time': processing_time,
-                'provider': 'claude'
-            }
-            
-        except Exception as e:
-            logger.error(f"Claude analysis failed: {e}")
-            return self._error_response(f"Claude analysis failed: {str(e)}")
+        canned = self._canned_response('claude', question)
+        if canned:
+            return canned
+        
+        if not self._ensure_claude_ready():
+            return self._error_response("Claude client not available")
+        
+        prompt = self._create_brisbane_prompt(question)
+        model = self.working_claude_model or Config.CLAUDE_MODELS[0]
+        return self._run_analysis('claude', model, self._call_claude, prompt, model)
     
     def analyze_with_gemini(self, question: str, claude_context: str = "") -> Dict:
         """Analyze question with Gemini"""
         if not self.gemini_model:
             return self._error_response("Gemini model not available")
         
+        canned = self._canned_response('gemini', question)
+        if canned:
+            return canned
+        
+        if not self._ensure_gemini_ready():
+            return self._error_response("Gemini model not available")
+        
+        prompt = self._create_gemini_prompt(question, claude_context)
+        model = self.working_gemini_model or Config.GEMINI_MODELS[0]
+        return self._run_analysis('gemini', model, self._call_gemini, prompt)
+    
+    def _run_analysis(self, provider: str, model: str, call, *args) -> Dict:
+        """Shared timing, circuit breaker and error handling for provider calls"""
         try:
-            prompt = self._create_gemini_prompt(question, claude_context)
-            model = self.working_gemini_model or Config.GEMINI_MODELS[0]
-            
             start_time = time.time()
-            response = self.gemini_model.generate_content(prompt)
+            with self._provider_slot(provider):
+                analysis = self.breakers[provider].call(call, *args)
             processing_time = time.time() - start_time
             
             return {
                 'success': True,
-                'analysis': response.text,
+                'analysis': analysis,
                 'model_used': model,
                 'processing_time': processing_time,
-                'provider': 'gemini'
+                'provider': provider
             }
             
+        except CircuitOpenError as e:
+            return self._circuit_open_response(e)
         except Exception as e:
-            logger.error(f"Gemini analysis failed: {e}")
-            return self._error_response(f"Gemini analysis failed: {str(e)}")
+            logger.error("%s analysis failed: %s", provider.title(), e)
+            return self._error_response(f"{provider.title()} analysis failed: {str(e)}")
+    
+    @contextmanager
+    def _provider_slot(self, provider: str):
+        """Hold one of the provider's concurrency slots, waiting at most LLM_TIMEOUT"""
+        slot = self._slots[provider]
+        if not slot.acquire(timeout=Config.LLM_TIMEOUT):
+            raise TimeoutError(f"{provider} concurrency limit of {Config.LLM_MAX_CONCURRENCY} reached")
+        try:
+            yield
+        finally:
+            slot.release()
+    
+    def _call_claude(self, prompt: str, model: str) -> str:
+        """Single Claude completion, returning the response text"""
+        response = self.claude_client.messages.create(
+            model=model,
+            max_tokens=1000,
+            messages=[{"role": "user", "content": prompt}],
+            timeout=Config.LLM_TIMEOUT
+        )
+        return response.content[0].text
+    
+    def _call_gemini(self, prompt: str) -> str:
+        """Single Gemini completion, returning the response text"""
+        return self._generate_gemini(prompt).text
+    
+    def _generate_gemini(self, prompt: str, timeout: Optional[float] = None, stream: bool = False,
+                         model=None):
+        """Gemini call bounded by LLM_TIMEOUT, retrying transient errors with full jitter.
+        With stream=True the deadline covers the wait for the first chunk only."""
+        timeout = timeout or Config.LLM_TIMEOUT
+        model = model or self.gemini_model
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        while True:
+            future = self._gemini_executor.submit(model.generate_content, prompt, stream=stream)
+            try:
+                return future.result(timeout=max(0, deadline - time.monotonic()))
+            except FuturesTimeoutError:
+                future.cancel()
+                raise TimeoutError(f"Gemini request exceeded {timeout}s")
+            except self._gemini_transient_errors as e:
+                attempt += 1
+                backoff = random.uniform(0, min(Config.LLM_RETRY_MAX_BACKOFF, 0.5 * 2 ** attempt))
+                if attempt > Config.LLM_MAX_RETRIES or time.monotonic() + backoff >= deadline:
+                    raise
+                logger.warning("Gemini transient error (attempt %s), retrying in %.2fs: %s", attempt, backoff, e)
+                time.sleep(backoff)
+    
+    def stream_with_claude(self, question: str):
+        """Yield Claude analysis text chunks as they are generated"""
+        if not self.claude_client or not self._ensure_claude_ready():
+            raise RuntimeError("Claude client not available")
+        
+        prompt = self._create_brisbane_prompt(question)
+        with self._provider_slot('claude'), self.breakers['claude'].guard():
+            with self.claude_client.messages.stream(
+                model=self.working_claude_model,
+                max_tokens=1000,
+                messages=[{"role": "user", "content": prompt}],
+                timeout=Config.LLM_TIMEOUT
+            ) as stream:
+                yield from stream.text_stream
+    
+    def stream_with_gemini(self, question: str, claude_context: str = ""):
+        """Yield Gemini analysis text chunks as they are generated"""
+        if not self.gemini_model or not self._ensure_gemini_ready():
+            raise RuntimeError("Gemini model not available")
+        
+        prompt = self._create_gemini_prompt(question, claude_context)
+        with self._provider_slot('gemini'), self.breakers['gemini'].guard():
+            # One deadline for the whole stream, like the buffered path
+            deadline = time.monotonic() + Config.LLM_TIMEOUT
+            chunks = iter(self._generate_gemini(prompt, stream=True))
+            while True:
+                # Each read goes through the executor so a stalled stream can't hold this thread
+                future = self._gemini_executor.submit(next, chunks, None)
+                try:
+                    chunk = future.result(timeout=max(0, deadline - time.monotonic()))
+                except FuturesTimeoutError:
+                    future.cancel()
+                    raise TimeoutError(f"Gemini stream exceeded {Config.LLM_TIMEOUT}s")
+                if chunk is None:
+                    return
+                yield chunk.text
+    
+    def _canned_response(self, provider: str, question: str) -> Optional[Dict]:
+        """Pre-recorded answer for known probe messages in development mode"""
+        if not Config.DEV_MODE:
+            return None
+        
+        answer = self.CANNED_RESPONSES.get((provider, question))
+        if answer is None:
+            return None
+        
+        working_model = self.working_claude_model if provider == 'claude' else self.working_gemini_model
+        return {
+            'success': True,
+            'analysis': answer,
+            'model_used': working_model,
+            'processing_time': 0,
+            'provider': provider,
+            'cached': True
+        }
     
     def _create_brisbane_prompt(self, question: str) -> str:
         """Create Brisbane-specific prompt for initial analysis"""
@@ -211,28 +486,55 @@ Build upon this context to provide your comprehensive analysis."""
             'processing_time': 0
         }
     
+    def _circuit_open_response(self, error: CircuitOpenError) -> Dict:
+        """Fail-fast response while a provider's circuit is open"""
+        response = self._error_response(str(error))
+        response['circuit_open'] = True
+        response['retry_after'] = error.retry_after
+        return response
+    
+    def get_retry_after(self) -> Optional[int]:
+        """Seconds to wait when every available provider's circuit is open, else None"""
+        providers = self.get_available_providers()
+        if not providers:
+            return None
+        
+        waits = []
+        for provider in providers:
+            breaker = self.breakers[provider]
+            if breaker.state != CircuitBreaker.OPEN:
+                return None
+            waits.append(breaker.retry_after())
+        return max(1, min(waits))
+    
     def get_health_status(self) -> Dict:
         """Get health status of all LLM services"""
         return {
             'claude': {
-                'available': self.claude_client is not None,
+                'available': self._is_available('claude'),
+                # False until a model has been selected against the live API
+                'verified': self._is_verified('claude'),
                 'enabled': Config.CLAUDE_ENABLED,
                 'working_model': self.working_claude_model,
-                'api_key_configured': bool(Config.CLAUDE_API_KEY)
+                'api_key_configured': bool(Config.CLAUDE_API_KEY),
+                'circuit': self.breakers['claude'].get_status()
             },
             'gemini': {
-                'available': self.gemini_model is not None,
+                'available': self._is_available('gemini'),
+                'verified': self._is_verified('gemini'),
                 'enabled': Config.GEMINI_ENABLED,
                 'working_model': self.working_gemini_model,
-                'api_key_configured': bool(Config.GEMINI_API_KEY)
+                'api_key_configured': bool(Config.GEMINI_API_KEY),
+                'circuit': self.breakers['gemini'].get_status()
             }
         }
     
+    def close(self):
+        """Release pooled upstream connections and worker threads"""
+        if self.http_client is not None:
+            self.http_client.close()
+        self._gemini_executor.shutdown(wait=False, cancel_futures=True)
+    
     def get_available_providers(self) -> list:
         """Get list of currently available LLM providers"""
-        providers = []
-        if self.claude_client:
-            providers.append('claude')
-        if self.gemini_model:
-            providers.append('gemini')
-        return providers
+        return [provider for provider in self.PROVIDERS if self._is_available(provider)]
@@ -5,23 +5,190 @@ High-level service for Brisbane property intelligence
 
 from typing import Dict, List
 from datetime import datetime
+from concurrent.futures import Future
+import hashlib
 import logging
+import re
+import threading
+import time
 
 from config import Config
+from utils.ttl_cache import TTLCache
 
 logger = logging.getLogger(__name__)
 
+# Mock data sources as (trigger keywords, source); empty keywords = always included.
+# Shared across requests and cached results, so treat the dicts as read-only.
+BRISBANE_DATA_SOURCES = (
+    ((), {
+        'source': 'Brisbane City Council',
+        'title': 'Development Applications - January 2025',
+        'summary': 'Recent development applications and planning decisions for Brisbane metropolitan area.',
+        'type': 'government_data',
+        'date': '2025-01-15',
+        'relevance': 'high'
+    }),
+    (('development', 'application', 'planning'), {
+        'source': 'Queensland Government',
+        'title': 'State Development Applications',
+        'summary': 'Major state-significant development applications affecting Brisbane region.',
+        'type': 'government_data',
+        'date': '2025-01-14',
+        'relevance': 'medium'
+    }),
+    (('suburb', 'trending', 'market'), {
+        'source': 'Property Observer',
+        'title': 'Brisbane Property Market Update',
+        'summary': 'Analysis of current market trends across Brisbane suburbs.',
+        'type': 'market_analysis',
+        'date': '2025-01-14',
+        'relevance': 'high'
+    }),
+    (('infrastructure', 'transport', 'rail'), {
+        'source': 'Queensland Government',
+        'title': 'Cross River Rail Property Impact Study',
+        'summary': 'Analysis of transport infrastructure impact on Brisbane property values.',
+        'type': 'infrastructure_news',
+        'date': '2025-01-12',
+        'relevance': 'high'
+    })
+)
+
+# One alternation per source so each check is a single regex search
+_SOURCE_MATCHERS = tuple(
+    (re.compile('|'.join(map(re.escape, keywords)), re.IGNORECASE) if keywords else None, source)
+    for keywords, source in BRISBANE_DATA_SOURCES
+)
+
 class PropertyAnalysisService:
     """High-level property analysis service"""
     
     def __init__(self, llm_service):
         self.llm_service = llm_service
+        self.response_cache = TTLCache(
+            maxsize=Config.RESPONSE_CACHE_SIZE,
+            ttl=Config.RESPONSE_CACHE_TTL
+        )
+        # Pipelines currently running, keyed like the response cache
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
     
     def analyze_property_question(self, question: str) -> Dict:
-        """Complete property analysis pipeline"""
+        """Complete property analysis pipeline, served from cache for repeated questions"""
+        cache_key = self._cache_key(question)
+        cached = self.response_cache.get(cache_key)
+        if cached:
+            return self._shared_result(cached, question)
+        
+        # Single-flight: identical questions arriving while one is running
+        # wait for that pipeline instead of issuing their own LLM calls
+        with self._inflight_lock:
+            pending = self._inflight.get(cache_key)
+            if pending is None:
+                future = Future()
+                self._inflight[cache_key] = future
+        
+        if pending is not None:
+            return self._shared_result(pending.result(), question)
+        
+        try:
+            result = self._run_pipeline(question)
+            self._cache_result(cache_key, result)
+            future.set_result(result)
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+        
+        return dict(result, cached=False)
+    
+    def stream_property_question(self, question: str):
+        """Analysis pipeline as (event, payload) pairs, streaming both LLM stages as they generate.
+        
+        Yields ('delta', {'stage', 'text'}) per chunk, ('stage', ...) as each LLM stage
+        finishes and a final ('result', ...) shaped like analyze_property_question().
+        """
+        cache_key = self._cache_key(question)
+        cached = self.response_cache.get(cache_key)
+        if cached:
+            yield 'result', self._shared_result(cached, question)
+            return
+        
+        claude_result = yield from self._stream_stage(
+            'claude', self.llm_service.stream_with_claude(question)
+        )
+        
+        data_sources = self._get_brisbane_data_sources(question)
+        
+        gemini_result = yield from self._stream_stage(
+            'gemini', self.llm_service.stream_with_gemini(question, claude_result.get('analysis', ''))
+        )
+        
+        result = self._build_result(question, claude_result, gemini_result, data_sources)
+        self._cache_result(cache_key, result)
+        yield 'result', dict(result, cached=False)
+    
+    def _stream_stage(self, provider: str, chunks):
+        """Relay one provider's text chunks as delta events and return its analysis result"""
+        parts = []
+        start_time = time.time()
+        try:
+            for text in chunks:
+                parts.append(text)
+                yield 'delta', {'stage': provider, 'text': text}
+            stage_result = {
+                'success': True,
+                'analysis': ''.join(parts),
+                'model_used': getattr(self.llm_service, f'working_{provider}_model'),
+                'processing_time': time.time() - start_time,
+                'provider': provider
+            }
+        except Exception as e:
+            logger.error("%s streaming failed: %s", provider.title(), e)
+            stage_result = {
+                'success': False,
+                'analysis': None,
+                'error': f"{provider.title()} analysis failed: {str(e)}",
+                'processing_time': time.time() - start_time
+            }
+        
+        yield 'stage', {
+            'stage': provider,
+            'success': stage_result['success'],
+            'model': stage_result.get('model_used')
+        }
+        return stage_result
+    
+    def _cache_result(self, cache_key: str, result: Dict):
+        """Cache answers that an LLM actually produced; partial ones only briefly"""
+        stages = result.get('processing_stages', {})
+        if not result['success']:
+            return
+        if stages.get('claude_success') and stages.get('gemini_success'):
+            self.response_cache.set(cache_key, result)
+        elif stages.get('claude_success') or stages.get('gemini_success'):
+            # One provider failed; retry it soon rather than pinning the error for an hour
+            self.response_cache.set(cache_key, result, ttl=Config.RESPONSE_CACHE_PARTIAL_TTL)
+    
+    def _shared_result(self, result: Dict, question: str) -> Dict:
+        """Result produced for another request, relabelled for this question"""
+        return dict(
+            result,
+            question=question,
+            question_type=self._determine_question_type(question),
+            cached=True
+        )
+    
+    def _cache_key(self, question: str) -> str:
+        """Cache key from the question with case, whitespace and trailing punctuation normalized"""
+        normalized = ' '.join(question.lower().split()).rstrip('?.! ')
+        return hashlib.sha256(normalized.encode('utf-8')).hexdigest()
+    
+    def _run_pipeline(self, question: str) -> Dict:
+        """Run Claude research, data source lookup and Gemini analysis"""
         try:
-            question_type = self._determine_question_type(question)
-            
             # Stage 1: Claude Analysis (Strategic Research)
             claude_result = self.llm_service.analyze_with_claude(question)
             
@@ -35,35 +202,38 @@ class PropertyAnalysisService:
             )
             
             # Stage 4: Format Final Answer
-            final_answer = self._format_comprehensive_answer(
-                question, claude_result, gemini_result, data_sources
-            )
-            
-            return {
-                'success': True,
-                'question': question,
-                'question_type': question_type,
-                'final_answer': final_answer,
-                'processing_stages': {
-                    'claude_success': claude_result['success'],
-                    'gemini_success': gemini_result['success'],
-                    'data_sources_count': len(data_sources),
-                    'claude_model': claude_result.get('model_used'),
-                    'gemini_model': gemini_result.get('model_used')
-                },
-                'claude_result': claude_result,
-                'gemini_result': gemini_result,
-                'data_sources': data_sources
-            }
+            return self._build_result(question, claude_result, gemini_result, data_sources)
             
         except Exception as e:
-            logger.error(f"Property analysis pipeline failed: {e}")
+            logger.error("Property analysis pipeline failed: %s", e)
             return {
                 'success': False,
                 'error': str(e),
                 'final_answer': self._generate_fallback_answer(question)
             }
     
+    def _build_result(self, question: str, claude_result: Dict,
+                      gemini_result: Dict, data_sources: List[Dict]) -> Dict:
+        """Combine the stage results into the pipeline result"""
+        return {
+            'success': True,
+            'question': question,
+            'question_type': self._determine_question_type(question),
+            'final_answer': self._format_comprehensive_answer(
+                question, claude_result, gemini_result, data_sources
+            ),
+            'processing_stages': {
+                'claude_success': claude_result['success'],
+                'gemini_success': gemini_result['success'],
+                'data_sources_count': len(data_sources),
+                'claude_model': claude_result.get('model_used'),
+                'gemini_model': gemini_result.get('model_used')
+            },
+            'claude_result': claude_result,
+            'gemini_result': gemini_result,
+            'data_sources': data_sources
+        }
+    
     def _determine_question_type(self, question: str) -> str:
         """Determine if question is preset or custom"""
         return 'preset' if question in Config.PRESET_QUESTIONS else 'custom'
@@ -72,51 +242,10 @@ class PropertyAnalysisService:
         """Get relevant Brisbane data sources for the question"""
         # For now, return mock sources based on question type
         # In future, this could integrate with real RSS feeds
-        
-        question_lower = question.lower()
-        sources = []
-        
-        # Always include Brisbane City Council
-        sources.append({
-            'source': 'Brisbane City Council',
-            'title': 'Development Applications - January 2025',
-            'summary': 'Recent development applications and planning decisions for Brisbane metropolitan area.',
-            'type': 'government_data',
-            'date': '2025-01-15',
-            'relevance': 'high'
-        })
-        
-        if any(keyword in question_lower for keyword in ['development', 'application', 'planning']):
-            sources.append({
-                'source': 'Queensland Government',
-                'title': 'State Development Applications',
-                'summary': 'Major state-significant development applications affecting Brisbane region.',
-                'type': 'government_data',
-                'date': '2025-01-14',
-                'relevance': 'medium'
-            })
-        
-        if any(keyword in question_lower for keyword in ['suburb', 'trending', 'market']):
-            sources.append({
-                'source': 'Property Observer',
-                'title': 'Brisbane Property Market Update',
-                'summary': 'Analysis of current market trends across Brisbane suburbs.',
-                'type': 'market_analysis',
-                'date': '2025-01-14',
-                'relevance': 'high'
-            })
-        
-        if any(keyword in question_lower for keyword in ['infrastructure', 'transport', 'rail']):
-            sources.append({
-                'source': 'Queensland Government',
-                'title': 'Cross River Rail Property Impact Study',
-                'summary': 'Analysis of transport infrastructure impact on Brisbane property values.',
-                'type': 'infrastructure_news',
-                'date': '2025-01-12',
-                'relevance': 'high'
-            })
-        
-        return sources
+        return [
+            source for pattern, source in _SOURCE_MATCHERS
+            if pattern is None or pattern.search(question)
+        ]
     
     def _format_comprehensive_answer(self, question: str, claude_result: Dict, 
                                    gemini_result: Dict, data_sources: List[Dict]) -> str:
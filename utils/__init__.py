@@ -3,5 +3,9 @@ Utilities package for Brisbane Property Intelligence
 """
 
 from .health_checker import HealthChecker
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
+from .ttl_cache import TTLCache
+from .json_provider import ORJSONProvider
+from .timestamps import now_iso
 
-__all__ = ['HealthChecker']
+__all__ = ['HealthChecker', 'CircuitBreaker', 'CircuitOpenError', 'TTLCache', 'ORJSONProvider', 'now_iso']
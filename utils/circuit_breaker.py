@@ -0,0 +1,118 @@
+"""
+Circuit Breaker for Brisbane Property Intelligence
+Fails fast on upstream providers that keep erroring
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+
+    def __init__(self, name: str, retry_after: int):
+        super().__init__(f"{name} circuit open, retry after {retry_after}s")
+        self.name = name
+        self.retry_after = retry_after
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker (closed -> open -> half-open)"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: int = 30):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current breaker state"""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def retry_after(self) -> int:
+        """Seconds until the breaker lets a trial call through"""
+        with self._lock:
+            if self._opened_at is None:
+                return 0
+            remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+            return max(0, int(remaining + 0.999))
+
+    def call(self, func, *args, **kwargs):
+        """Run func through the breaker, raising CircuitOpenError when open"""
+        with self.guard():
+            return func(*args, **kwargs)
+
+    @contextmanager
+    def guard(self):
+        """Context manager form of call() for work that is not a single function call, such as streams"""
+        self._acquire()
+        try:
+            yield
+        except Exception:
+            self._record_failure()
+            raise
+        except BaseException:
+            # Abandoned mid-call, e.g. a client disconnecting from a stream
+            self._release_trial()
+            raise
+
+        self._record_success()
+
+    def _acquire(self):
+        with self._lock:
+            state = self._current_state()
+            if state == self.OPEN or (state == self.HALF_OPEN and self._trial_in_progress):
+                remaining = self.reset_timeout - (time.monotonic() - self._opened_at)
+                raise CircuitOpenError(self.name, max(1, int(remaining + 0.999)))
+            if state == self.HALF_OPEN:
+                self._trial_in_progress = True
+
+    def _release_trial(self):
+        with self._lock:
+            self._trial_in_progress = False
+
+    def _record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_progress = False
+            if self._opened_at is not None or self._failures >= self.fail_max:
+                if self._opened_at is None:
+                    logger.warning("%s circuit opened after %s consecutive failures", self.name, self._failures)
+                self._opened_at = time.monotonic()
+
+    def _record_success(self):
+        with self._lock:
+            if self._opened_at is not None:
+                logger.info("%s circuit closed", self.name)
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def get_status(self) -> Dict:
+        """Breaker status for health reporting"""
+        with self._lock:
+            return {
+                'state': self._current_state(),
+                'consecutive_failures': self._failures,
+                'fail_max': self.fail_max,
+                'reset_timeout': self.reset_timeout
+            }
@@ -5,9 +5,11 @@ Professional health monitoring for all services
 
 import sys
 import logging
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict
 from config import Config
+from .ttl_cache import TTLCache
+from .timestamps import now_iso
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +18,11 @@ class HealthChecker:
     
     def __init__(self, services: Dict):
         self.services = services
+        self._health_cache = TTLCache(maxsize=1, ttl=Config.HEALTH_CACHE_TTL)
+        # Config is read from the environment once at import, so these
+        # sections cannot change for the life of the process
+        self._environment_info = self._get_environment_info()
+        self._configuration = self._check_configuration()
     
     def get_service_status(self) -> Dict:
         """Get basic service status for API responses"""
@@ -23,20 +30,31 @@ class HealthChecker:
             'database': 'connected' if self.services.get('database') else 'disconnected',
             'llm_service': 'connected' if self.services.get('llm') else 'disconnected',
             'property_service': 'connected' if self.services.get('property') else 'disconnected',
-            'claude': self._get_claude_status(),
-            'gemini': self._get_gemini_status()
+            'claude': self._get_provider_status('claude'),
+            'gemini': self._get_provider_status('gemini')
         }
     
     def get_comprehensive_health(self) -> Dict:
-        """Get comprehensive health check for detailed monitoring"""
+        """Get comprehensive health check, reusing the last result for HEALTH_CACHE_TTL seconds"""
+        cached = self._health_cache.get('health')
+        if cached:
+            return cached
+        
+        health_data = self._build_comprehensive_health()
+        if health_data['status'] != 'error':
+            self._health_cache.set('health', health_data)
+        return health_data
+    
+    def _build_comprehensive_health(self) -> Dict:
+        """Run every health probe and assemble the full report"""
         try:
             health_data = {
                 'status': 'healthy',
-                'timestamp': datetime.now().isoformat(),
+                'timestamp': now_iso(),
                 'python_version': sys.version.split()[0],
-                'environment': self._get_environment_info(),
+                'environment': self._environment_info,
                 'services': self._check_all_services(),
-                'configuration': self._check_configuration(),
+                'configuration': self._configuration,
                 'llm_providers': self._check_llm_providers()
             }
             
@@ -53,45 +71,30 @@ class HealthChecker:
             return health_data
             
         except Exception as e:
-            logger.error(f"Health check failed: {e}")
+            logger.error("Health check failed: %s", e)
             return {
                 'status': 'error',
                 'error': str(e),
-                'timestamp': datetime.now().isoformat()
+                'timestamp': now_iso()
             }
     
-    def _get_claude_status(self) -> str:
-        """Get Claude-specific status"""
-        llm_service = self.services.get('llm')
-        if not llm_service:
-            return 'service_unavailable'
-        
-        health = llm_service.get_health_status()
-        claude_health = health.get('claude', {})
-        
-        if claude_health.get('available'):
-            return 'connected'
-        elif claude_health.get('enabled') and claude_health.get('api_key_configured'):
-            return 'configured_but_failed'
-        elif claude_health.get('enabled'):
-            return 'enabled_no_key'
-        else:
-            return 'disabled'
-    
-    def _get_gemini_status(self) -> str:
-        """Get Gemini-specific status"""
+    def _get_provider_status(self, provider: str) -> str:
+        """Get status string for a single LLM provider"""
         llm_service = self.services.get('llm')
         if not llm_service:
             return 'service_unavailable'
         
         health = llm_service.get_health_status()
-        gemini_health = health.get('gemini', {})
+        provider_health = health.get(provider, {})
         
-        if gemini_health.get('available'):
+        if provider_health.get('verified'):
             return 'connected'
-        elif gemini_health.get('enabled') and gemini_health.get('api_key_configured'):
+        elif provider_health.get('available'):
+            # Enabled with a key, but no call has succeeded yet in this worker
+            return 'configured'
+        elif provider_health.get('enabled') and provider_health.get('api_key_configured'):
             return 'configured_but_failed'
-        elif gemini_health.get('enabled'):
+        elif provider_health.get('enabled'):
             return 'enabled_no_key'
         else:
             return 'disabled'
@@ -223,27 +226,23 @@ class HealthChecker:
         
         health_status = llm_service.get_health_status()
         
-        provider_details = {}
-        
-        # Claude details
-        claude_info = health_status.get('claude', {})
-        provider_details['claude'] = {
-            'enabled': claude_info.get('enabled', False),
-            'api_key_configured': claude_info.get('api_key_configured', False),
-            'client_available': claude_info.get('available', False),
-            'working_model': claude_info.get('working_model'),
-            'supported_models': Config.CLAUDE_MODELS
+        supported_models = {
+            'claude': Config.CLAUDE_MODELS,
+            'gemini': Config.GEMINI_MODELS
         }
         
-        # Gemini details  
-        gemini_info = health_status.get('gemini', {})
-        provider_details['gemini'] = {
-            'enabled': gemini_info.get('enabled', False),
-            'api_key_configured': gemini_info.get('api_key_configured', False),
-            'client_available': gemini_info.get('available', False),
-            'working_model': gemini_info.get('working_model'),
-            'supported_models': Config.GEMINI_MODELS
-        }
+        provider_details = {}
+        for provider, models in supported_models.items():
+            info = health_status.get(provider, {})
+            provider_details[provider] = {
+                'enabled': info.get('enabled', False),
+                'api_key_configured': info.get('api_key_configured', False),
+                'client_available': info.get('verified', False),
+                'configured': info.get('available', False),
+                'working_model': info.get('working_model'),
+                'supported_models': models,
+                'circuit': info.get('circuit')
+            }
         
         return {
             'available': llm_service.get_available_providers(),
@@ -253,43 +252,34 @@ class HealthChecker:
     def perform_deep_health_check(self) -> Dict:
         """Perform deep health check with actual API calls"""
         deep_check = {
-            'timestamp': datetime.now().isoformat(),
+            'timestamp': now_iso(),
             'basic_health': self.get_comprehensive_health(),
             'api_tests': {}
         }
         
         llm_service = self.services.get('llm')
-        if llm_service:
-            # Test Claude with minimal call
-            if llm_service.claude_client:
-                try:
-                    claude_test = llm_service.analyze_with_claude("Test connection")
-                    deep_check['api_tests']['claude'] = {
-                        'success': claude_test['success'],
-                        'response_time': claude_test.get('processing_time', 0),
-                        'model_used': claude_test.get('model_used'),
-                        'error': claude_test.get('error')
-                    }
-                except Exception as e:
-                    deep_check['api_tests']['claude'] = {
-                        'success': False,
-                        'error': str(e)
-                    }
-            
-            # Test Gemini with minimal call
-            if llm_service.gemini_model:
-                try:
-                    gemini_test = llm_service.analyze_with_gemini("Test connection")
-                    deep_check['api_tests']['gemini'] = {
-                        'success': gemini_test['success'],
-                        'response_time': gemini_test.get('processing_time', 0),
-                        'model_used': gemini_test.get('model_used'),
-                        'error': gemini_test.get('error')
-                    }
-                except Exception as e:
-                    deep_check['api_tests']['gemini'] = {
-                        'success': False,
-                        'error': str(e)
-                    }
+        providers = llm_service.get_available_providers() if llm_service else []
+        if providers:
+            # Probe providers concurrently so the check takes max() not sum() of their latencies
+            with ThreadPoolExecutor(max_workers=len(providers)) as executor:
+                results = executor.map(lambda provider: self._probe_provider(llm_service, provider), providers)
+                deep_check['api_tests'] = dict(zip(providers, results))
         
-        return deep_check
\ No newline at end of file
+        return deep_check
+    
+    def _probe_provider(self, llm_service, provider: str) -> Dict:
+        """Minimal API call against a single provider"""
+        try:
+            test = llm_service.analyze(provider, llm_service.PROBE_MESSAGE)
+            return {
+                'success': test['success'],
+                'response_time': test.get('processing_time', 0),
+                'model_used': test.get('model_used'),
+                'cached': test.get('cached', False),
+                'error': test.get('error')
+            }
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
\ No newline at end of file
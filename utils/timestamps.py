@@ -0,0 +1,20 @@
+"""
+Timestamps for Brisbane Property Intelligence
+Second-resolution ISO timestamps, formatted once per second
+"""
+
+import time
+from datetime import datetime
+
+# (epoch second, formatted) - replaced as a whole so readers never see a torn pair
+_cached = (None, '')
+
+def now_iso() -> str:
+    """Current local time as an ISO 8601 string, truncated to the second"""
+    global _cached
+    second = int(time.time())
+    cached_second, formatted = _cached
+    if second != cached_second:
+        formatted = datetime.fromtimestamp(second).isoformat()
+        _cached = (second, formatted)
+    return formatted